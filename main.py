@@ -85,6 +85,25 @@ class EnhancedCameraDetector:
         return best_camera
 
 class BalancedDocumentProcessor:
+    # Whitelists para as passadas direcionadas por campo
+    TELEFONE_WHITELIST = '0123456789()-.+'
+    NOME_WHITELIST = ('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+                      'áàâãéêíóôõúçÁÀÂÃÉÊÍÓÔÕÚÇ')
+    # Rótulos que indicam em qual linha está cada campo
+    FIELD_LABELS = {
+        'telefone': r'\b(?:tel|telefone|celular|fone|whats\w*)\b',
+        'nome': r'\b(?:nome|name|cliente|client)\b'
+    }
+
+    # Esforço padrão do OCR; o AdaptiveOCRScheduler sobrescreve por nível
+    DEFAULT_PROFILE = {
+        'preprocess': 'basico',
+        'upscale': 1.5,
+        'max_configs': 5,
+        'targeted': True,
+        'max_candidates': 2
+    }
+
     def __init__(self, tesseract_path=None):
         if tesseract_path and os.path.exists(tesseract_path):
             pytesseract.pytesseract.tesseract_cmd = tesseract_path
@@ -92,15 +111,20 @@ class BalancedDocumentProcessor:
         else:
             print("⚠️  Usando Tesseract do PATH do sistema")
 
+    def _profile(self, profile):
+        return {**self.DEFAULT_PROFILE, **(profile or {})}
+
+    def _to_gray(self, frame):
+        if len(frame.shape) == 3:
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return frame
+
     def enhance_image_basic(self, frame):
         """
         Melhorias BÁSICAS e eficazes para OCR
         """
         # 1. Converte para escala de cinza
-        if len(frame.shape) == 3:
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        else:
-            gray = frame
+        gray = self._to_gray(frame)
 
         # 2. Melhora contraste com CLAHE (menos agressivo)
         clahe = cv2.createCLAHE(clipLimit=1.5, tileGridSize=(8,8))
@@ -116,9 +140,22 @@ class BalancedDocumentProcessor:
 
         return thresh
 
-    def extract_text_balanced(self, frame):
+    def enhance_image_light(self, frame):
+        """
+        Melhorias LEVES para máquinas fracas (só cinza + Otsu)
+        """
+        gray = self._to_gray(frame)
+
+        _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+        return thresh
+
+    def extract_text_balanced(self, frame, profile=None):
         """
         OCR EQUILIBRADO - funciona melhor que o anterior
+
+        profile (opcional) sobrescreve DEFAULT_PROFILE: variante de
+        pré-processamento, upscale e quantas configs PSM tentar.
         """
         try:
             # Tenta PRIMEIRO com imagem original
@@ -138,17 +175,35 @@ class BalancedDocumentProcessor:
                 print(f"✅ OCR básico funcionou: {text_simple[:50]}...")
                 return text_simple.strip()
 
-            # Se não funcionou, tenta com melhorias
+        except Exception as e:
+            print(f"❌ Erro no OCR: {e}")
+            return ""
+
+        # Se não funcionou, tenta com melhorias
+        return self.extract_text_enhanced(frame, profile)
+
+    def extract_text_enhanced(self, frame, profile=None):
+        """
+        OCR com MELHORIAS na imagem (sem a passada simples na imagem crua)
+        """
+        profile = self._profile(profile)
+
+        try:
             print("🔧 Aplicando melhorias na imagem...")
-            enhanced_frame = self.enhance_image_basic(frame)
+            if profile['preprocess'] == 'leve':
+                enhanced_frame = self.enhance_image_light(frame)
+            else:
+                enhanced_frame = self.enhance_image_basic(frame)
 
-            # Upscale moderado (só x1.5)
-            height, width = enhanced_frame.shape[:2]
-            upscaled = cv2.resize(enhanced_frame,
-                                (int(width * 1.5), int(height * 1.5)),
-                                interpolation=cv2.INTER_CUBIC)
+            # Upscale definido pelo perfil (padrão x1.5)
+            upscale = profile['upscale']
+            if upscale != 1.0:
+                height, width = enhanced_frame.shape[:2]
+                enhanced_frame = cv2.resize(enhanced_frame,
+                                          (int(width * upscale), int(height * upscale)),
+                                          interpolation=cv2.INTER_CUBIC)
 
-            pil_enhanced = Image.fromarray(upscaled)
+            pil_enhanced = Image.fromarray(enhanced_frame)
 
             # Configurações do Tesseract mais simples
             configs = [
@@ -161,7 +216,7 @@ class BalancedDocumentProcessor:
 
             best_text = ""
 
-            for config in configs:
+            for config in configs[:profile['max_configs']]:
                 try:
                     text = pytesseract.image_to_string(pil_enhanced, config=config)
                     if text and len(text.strip()) > len(best_text):
@@ -180,6 +235,184 @@ class BalancedDocumentProcessor:
             print(f"❌ Erro no OCR: {e}")
             return ""
 
+    def find_candidate_lines(self, gray):
+        """
+        Passada RÁPIDA de layout: agrupa as palavras em linhas com bounding box
+        Retorna (candidatos por campo, linhas com texto/confiança/dados)
+        """
+        layout = pytesseract.image_to_data(Image.fromarray(gray), lang='por',
+                                           config='--oem 3 --psm 3',
+                                           output_type=pytesseract.Output.DICT)
+
+        words_by_line = {}
+        for i, word in enumerate(layout['text']):
+            word = word.strip()
+            if not word:
+                continue
+
+            key = (layout['block_num'][i], layout['par_num'][i], layout['line_num'][i])
+            x, y = layout['left'][i], layout['top'][i]
+            w, h = layout['width'][i], layout['height'][i]
+
+            words_by_line.setdefault(key, []).append(
+                (word, [x, y, x + w, y + h], float(layout['conf'][i])))
+
+        def union_box(words):
+            boxes = [box for _, box, _ in words]
+            return [min(b[0] for b in boxes), min(b[1] for b in boxes),
+                    max(b[2] for b in boxes), max(b[3] for b in boxes)]
+
+        lines = []
+        ranked = {'telefone': [], 'nome': []}
+        previous_text = ""
+        for words in words_by_line.values():
+            text = ' '.join(word for word, _, _ in words)
+            confs = [conf for _, _, conf in words if conf >= 0]
+            line = {
+                'text': text,
+                'conf': sum(confs) / len(confs) / 100.0 if confs else 0.0,
+                'parsed': self.parse_flexible_data(text),
+                'rank': {}
+            }
+            lines.append(line)
+
+            digits = len(re.sub(r'[^\d]', '', text))
+            letters = len(re.findall(r'[a-záàâãéêíóôõúç]', text.lower()))
+
+            # Linha com cara de telefone: recorta só as palavras com dígitos,
+            # deixando de fora rótulos como "Tel:" que a whitelist viraria lixo
+            if digits >= 8:
+                field = 'telefone'
+                box = union_box([w for w in words if re.search(r'\d', w[0])])
+            # Linha com cara de nome: 2+ palavras, quase só letras
+            elif len(words) >= 2 and letters >= 5 and digits <= 2:
+                field = 'nome'
+                box = union_box(words)
+            else:
+                previous_text = text
+                continue
+
+            # Prioridade: rótulo (na linha ou na anterior) vem antes de já validar.
+            # Títulos do formulário também passam no parser, mas não têm rótulo.
+            has_label = re.search(self.FIELD_LABELS[field], f"{previous_text} {text}", re.IGNORECASE)
+            validates = field in line['parsed']
+            rank = (0 if has_label else 2) + (0 if validates else 1)
+            line['rank'][field] = rank
+            ranked[field].append((rank, box))
+            previous_text = text
+
+        candidates = {field: [box for _, box in sorted(boxes, key=lambda c: c[0])]
+                      for field, boxes in ranked.items()}
+
+        return candidates, lines
+
+    def ocr_line(self, gray, box, whitelist, profile):
+        """
+        OCR de UMA linha recortada, com whitelist e PSM 7 (linha única)
+        Retorna (texto, confiança 0-1)
+        """
+        x1, y1, x2, y2 = box
+        pad = max(4, (y2 - y1) // 4)
+        height, width = gray.shape[:2]
+        crop = gray[max(0, y1 - pad):min(height, y2 + pad),
+                    max(0, x1 - pad):min(width, x2 + pad)]
+
+        if crop.size == 0:
+            return "", 0.0
+
+        # Linhas pequenas precisam de mais upscale (~40px de altura ajuda o Tesseract)
+        scale = max(profile['upscale'], 40.0 / crop.shape[0])
+        if scale != 1.0:
+            crop = cv2.resize(crop, (int(crop.shape[1] * scale), int(crop.shape[0] * scale)),
+                              interpolation=cv2.INTER_CUBIC)
+
+        config = f'--oem 3 --psm 7 -l por -c tessedit_char_whitelist={whitelist}'
+        result = pytesseract.image_to_data(Image.fromarray(crop), config=config,
+                                           output_type=pytesseract.Output.DICT)
+
+        words = []
+        confs = []
+        for word, conf in zip(result['text'], result['conf']):
+            word = word.strip()
+            if word and float(conf) >= 0:
+                words.append(word)
+                confs.append(float(conf))
+
+        if not words:
+            return "", 0.0
+
+        return ' '.join(words), sum(confs) / len(confs) / 100.0
+
+    def extract_fields_targeted(self, frame, profile=None):
+        """
+        OCR DIRECIONADO por campo: layout rápido + re-OCR das linhas candidatas
+        Retorna (dados, confiança por campo, texto da passada de layout)
+        """
+        profile = self._profile(profile)
+
+        data = {}
+        confidences = {}
+
+        try:
+            print("🎯 OCR direcionado por campo...")
+            gray = self._to_gray(frame)
+            candidates, lines = self.find_candidate_lines(gray)
+            layout_text = '\n'.join(line['text'] for line in lines)
+
+            whitelists = {
+                'telefone': self.TELEFONE_WHITELIST,
+                'nome': self.NOME_WHITELIST
+            }
+
+            for field, whitelist in whitelists.items():
+                for box in candidates[field][:profile['max_candidates']]:
+                    text, conf = self.ocr_line(gray, box, whitelist, profile)
+                    if not text:
+                        continue
+
+                    # Para assim que o campo valida
+                    parsed = self.parse_flexible_data(text)
+                    if field in parsed:
+                        data[field] = parsed[field]
+                        confidences[field] = round(conf, 2)
+                        break
+
+            # Campos que faltaram: reaproveita o layout em vez de outra passada,
+            # com a confiança da linha de onde veio o valor
+            missing = [field for field in whitelists if field not in data]
+            for field in missing:
+                for line in sorted(lines, key=lambda l: l['rank'].get(field, 4)):
+                    if field in line['parsed']:
+                        data[field] = line['parsed'][field]
+                        confidences[field] = round(line['conf'], 2)
+                        break
+
+            # Ainda faltando (ex.: rótulo e valor em linhas diferentes): página inteira
+            missing = [field for field in whitelists if field not in data]
+            if layout_text and missing:
+                page_data = self.parse_flexible_data(layout_text)
+                for field in missing:
+                    if field not in page_data:
+                        continue
+
+                    value = page_data[field]
+                    data[field] = value
+                    if field == 'telefone':
+                        source = [l for l in lines if value in re.sub(r'[^\d]', '', l['text'])]
+                    else:
+                        source = [l for l in lines if value.lower() in l['text'].lower()]
+                    source = source or lines
+                    confidences[field] = round(sum(l['conf'] for l in source) / len(source), 2)
+
+            if data:
+                print(f"✅ OCR direcionado: {data} (confiança: {confidences})")
+
+            return data, confidences, layout_text
+
+        except Exception as e:
+            print(f"❌ Erro no OCR direcionado: {e}")
+            return {}, {}, ""
+
     def parse_flexible_data(self, text):
         """
         Parser com FILTRO INTELIGENTE para nomes
@@ -309,6 +542,148 @@ class BalancedDocumentProcessor:
 
         return data
 
+class AdaptiveOCRScheduler:
+    """
+    Controlador que ajusta o esforço do OCR ao hardware em tempo real.
+
+    Mede a latência do OCR e a carga de CPU do sistema (que inclui o
+    processo do Tesseract) e sobe ou desce um nível na escada de PROFILES
+    para manter a latência abaixo do alvo e o uso abaixo de max_cores.
+    """
+
+    # Do mais leve (laptop fraco) ao mais pesado (desktop rápido).
+    # Além da amostragem, cada nível sobrescreve o DEFAULT_PROFILE do processador.
+    PROFILES = [
+        {'frame_skip': 30, 'cooldown': 4.0, 'preprocess': 'leve', 'upscale': 1.0, 'max_configs': 1,
+         'targeted': False, 'max_candidates': 0},
+        {'frame_skip': 20, 'cooldown': 3.0, 'preprocess': 'leve', 'upscale': 1.25, 'max_configs': 2,
+         'targeted': True, 'max_candidates': 1},
+        {'frame_skip': 15, 'cooldown': 3.0, 'preprocess': 'basico', 'upscale': 1.5, 'max_configs': 5,
+         'targeted': True, 'max_candidates': 2},
+        {'frame_skip': 8, 'cooldown': 2.0, 'preprocess': 'basico', 'upscale': 1.75, 'max_configs': 5,
+         'targeted': True, 'max_candidates': 3},
+        {'frame_skip': 4, 'cooldown': 1.0, 'preprocess': 'basico', 'upscale': 2.0, 'max_configs': 5,
+         'targeted': True, 'max_candidates': 3},
+    ]
+    DEFAULT_LEVEL = 2  # Equivale aos valores fixos antigos
+
+    def __init__(self, target_latency_ms=1500, max_cores=None):
+        self.target_latency = target_latency_ms / 1000.0
+        self.max_cores = max_cores
+        self.level = self.DEFAULT_LEVEL
+
+        self.latency_ema = None
+        self.cores_ema = None
+        self.samples_since_change = 0
+        self.min_samples_between_changes = 3
+
+        self._start_cpu = None
+        self._start_wall = None
+
+        # Limita as threads OpenMP do Tesseract (o subprocesso herda o ambiente)
+        if max_cores:
+            os.environ['OMP_THREAD_LIMIT'] = str(max(1, int(max_cores)))
+
+    @property
+    def profile(self):
+        return self.PROFILES[self.level]
+
+    def _system_cpu_times(self):
+        """
+        Tempos de CPU do sistema inteiro: (ocupado, total), ou None se indisponível
+        """
+        # Mede o sistema todo porque no Windows os.times() não enxerga o Tesseract
+        try:
+            if platform.system().lower() == 'windows':
+                import ctypes
+                from ctypes import wintypes
+
+                idle, kernel, user = wintypes.FILETIME(), wintypes.FILETIME(), wintypes.FILETIME()
+                if not ctypes.windll.kernel32.GetSystemTimes(ctypes.byref(idle),
+                                                             ctypes.byref(kernel),
+                                                             ctypes.byref(user)):
+                    return None
+
+                def seconds(ft):
+                    return ((ft.dwHighDateTime << 32) | ft.dwLowDateTime) / 1e7
+
+                # O tempo de kernel já inclui o tempo ocioso
+                total = seconds(kernel) + seconds(user)
+                return total - seconds(idle), total
+
+            with open('/proc/stat') as stat:
+                fields = [float(v) for v in stat.readline().split()[1:9]]
+            idle = fields[3] + fields[4]  # idle + iowait
+            total = sum(fields)
+            return total - idle, total
+
+        except (OSError, AttributeError, ValueError, IndexError):
+            return None
+
+    def _ema(self, old, new, alpha=0.3):
+        return new if old is None else old + alpha * (new - old)
+
+    def start(self):
+        """
+        Marca o início de uma passada de OCR
+        """
+        self._start_cpu = self._system_cpu_times()
+        self._start_wall = time.time()
+
+    def record(self):
+        """
+        Registra a passada de OCR iniciada em start() e reajusta o nível
+        """
+        if self._start_wall is None:
+            return
+
+        # Latência e CPU medidos só na janela do OCR (sem cooldown nem input())
+        latency = time.time() - self._start_wall
+        end_cpu = self._system_cpu_times()
+        if self._start_cpu and end_cpu and end_cpu[1] > self._start_cpu[1]:
+            # Fração ocupada da máquina convertida em núcleos
+            busy = (end_cpu[0] - self._start_cpu[0]) / (end_cpu[1] - self._start_cpu[1])
+            cores = busy * (os.cpu_count() or 1)
+            self.cores_ema = self._ema(self.cores_ema, cores)
+        self._start_wall = None
+
+        self.latency_ema = self._ema(self.latency_ema, latency)
+
+        self.samples_since_change += 1
+        self._adjust()
+
+    def _adjust(self):
+        if self.samples_since_change < self.min_samples_between_changes:
+            return
+
+        overloaded = (self.latency_ema > self.target_latency
+                      or (self.max_cores and self.cores_ema is not None
+                          and self.cores_ema > self.max_cores))
+
+        # Só sobe com folga clara, para não oscilar entre níveis
+        has_headroom = (self.latency_ema < self.target_latency * 0.6
+                        and (not self.max_cores or self.cores_ema is None
+                             or self.cores_ema < self.max_cores * 0.6))
+
+        if overloaded and self.level > 0:
+            self.level -= 1
+            print(f"🐢 Reduzindo esforço do OCR -> nível {self.level} ({self.status()})")
+        elif has_headroom and self.level < len(self.PROFILES) - 1:
+            self.level += 1
+            print(f"🚀 Aumentando esforço do OCR -> nível {self.level} ({self.status()})")
+        else:
+            return
+
+        # Recomeça as médias: o nível novo não herda a latência do anterior
+        self.latency_ema = None
+        self.cores_ema = None
+        self.samples_since_change = 0
+
+    def status(self):
+        latency_ms = int((self.latency_ema or 0) * 1000)
+        cores = f"{self.cores_ema:.1f}" if self.cores_ema is not None else "?"
+        return f"latência {latency_ms}ms, CPU {cores} núcleos"
+
 class EnhancedFormFiller:
     def __init__(self, headless=False):
         options = webdriver.ChromeOptions()
@@ -373,16 +748,22 @@ class EnhancedFormFiller:
             pass
 
 class BalancedLiveAutomation:
-    def __init__(self, tesseract_path=None):
+    def __init__(self, tesseract_path=None, target_latency_ms=1500, max_cores=None):
         self.processor = BalancedDocumentProcessor(tesseract_path)
+        self.scheduler = AdaptiveOCRScheduler(target_latency_ms, max_cores)
         self.camera_detector = EnhancedCameraDetector()
         self.form_filler = None
         self.camera = None
         self.is_running = False
         self.last_successful_data = {}
         self.last_process_time = 0
-        self.process_cooldown = 3  # Aumentado para evitar spam
         self.frame_skip = 0
+        self.last_confidences = {}
+
+    @property
+    def process_cooldown(self):
+        # Definido pelo scheduler adaptativo
+        return self.scheduler.profile['cooldown']
 
     def setup_camera(self):
         print("🎥 Configurando câmera...")
@@ -436,24 +817,39 @@ class BalancedLiveAutomation:
 
         # Pula frames para não sobrecarregar
         self.frame_skip += 1
-        if self.frame_skip < 15:  # Processa a cada 15 frames
+        if self.frame_skip < self.scheduler.profile['frame_skip']:
             return None
         self.frame_skip = 0
 
         try:
             print("🔍 Processando frame...")
-            time.sleep(2)
-            # Usa OCR balanceado
-            text = self.processor.extract_text_balanced(frame)
+            # Tenta primeiro o OCR direcionado por campo, com esforço definido pelo scheduler
+            self.scheduler.start()
+            profile = self.scheduler.profile
+            data, confidences, text = {}, {}, ""
+            if profile['targeted']:
+                data, confidences, layout_text = self.processor.extract_fields_targeted(frame, profile)
+
+                # Layout na imagem crua não achou texto: vai direto para as melhorias
+                if not layout_text:
+                    text = self.processor.extract_text_enhanced(frame, profile)
+            else:
+                # Perfil leve: modo direcionado desligado
+                text = self.processor.extract_text_balanced(frame, profile)
 
-            if not text:
-                print("❌ Nenhum texto detectado")
-                return None
+            if text:
+                data = self.processor.parse_flexible_data(text)
 
-            # Usa parser flexível
-            data = self.processor.parse_flexible_data(text)
+            self.scheduler.record()
 
+            if not data:
+                print("❌ Nenhum dado detectado")
+                return None
+
+            self.last_confidences = confidences
             print(f"📊 Dados extraídos: {data}")
+            if confidences:
+                print(f"📈 Confiança por campo: {confidences}")
 
             # Aceita se tem pelo menos 1 campo
             if data and len(data) >= 1:
@@ -494,9 +890,13 @@ class BalancedLiveAutomation:
                         formatted = f"({value[:2]}) {value[2:7]}-{value[7:]}"
                     else:
                         formatted = f"({value[:2]}) {value[2:6]}-{value[6:]}"
-                    print(f"   📞 {key.upper()}: {formatted}")
+                    line = f"   📞 {key.upper()}: {formatted}"
                 else:
-                    print(f"   📝 {key.upper()}: {value}")
+                    line = f"   📝 {key.upper()}: {value}"
+
+                if key in self.last_confidences:
+                    line += f" (confiança {int(self.last_confidences[key] * 100)}%)"
+                print(line)
 
             print(f"\n📝 Preenchendo formulário...")
             successful_fills = self.form_filler.fill_form(data) # type: ignore
@@ -630,8 +1030,12 @@ def main():
 
     form_url = "file://" + os.path.abspath(html_file)
 
+    # Alvos do scheduler adaptativo (ajuste conforme a máquina)
+    target_latency_ms = 1500
+    max_cores = None  # Ex.: 2 para limitar o Tesseract a 2 núcleos
+
     # Cria automação equilibrada
-    automation = BalancedLiveAutomation(tesseract_path)
+    automation = BalancedLiveAutomation(tesseract_path, target_latency_ms, max_cores)
 
     try:
         print("🎥 Configurando câmera...")
@@ -650,6 +1054,7 @@ def main():
         print(f"   🌐 Formulário: {os.path.basename(html_file)}")
         print(f"   📝 Campos: Nome + Telefone")
         print(f"   🧠 OCR: Equilibrado e flexível")
+        print(f"   ⚙️  Scheduler: latência alvo {target_latency_ms}ms, núcleos {max_cores or 'sem limite'}")
 
         input(f"\n▶️  ENTER para iniciar...")
 